@@ -26,20 +26,20 @@ try:
     logger.debug("Successfully imported graphql module")
     
     from .base import (
-        TracedGraphQLSchema, traced_graphql,
+        TracedGraphQLSchema, traced_graphql, set_service,
         TYPE, SERVICE, QUERY, ERRORS, INVALID, RES_NAME, DATA_EMPTY,
         CLIENT_ERROR
     )
     from .patch import patch, unpatch
     __all__ = [
         'TracedGraphQLSchema',
-        'patch', 'unpatch', 'traced_graphql',
+        'patch', 'unpatch', 'traced_graphql', 'set_service',
         'TYPE', 'SERVICE', 'QUERY', 'ERRORS', 'INVALID',
         'RES_NAME', 'DATA_EMPTY', 'CLIENT_ERROR',
     ]
     logger.info("Successfully initialized ddtrace-graphql")
     
 except ImportError as error:
-    logger.error(f"Failed to import required modules: {error}")
+    logger.error("Failed to import required modules: %s", error)
     logger.error("ddtrace-graphql requires ddtrace >= 1.5.5 and graphql-core")
     raise
\ No newline at end of file
@@ -1,6 +1,8 @@
 import logging
 import os
+import sys
 import asyncio
+from types import CoroutineType
 
 import ddtrace
 import graphql
@@ -18,13 +20,64 @@ ERRORS = 'errors'
 INVALID = 'invalid'
 CLIENT_ERROR = 'client_error'
 DATA_EMPTY = 'data_empty'
-RES_NAME = 'graphql.graphql'
+# identifier-like literals above are interned by the compiler already
+RES_NAME = sys.intern('graphql.graphql')
 #
 SERVICE_ENV_VAR = 'DDTRACE_GRAPHQL_SERVICE'
 SERVICE = 'graphql'
+MAX_QUERY_LEN_ENV_VAR = 'DDTRACE_GRAPHQL_MAX_QUERY_LEN'
+DEFAULT_MAX_QUERY_LEN = 8192
+TRUNCATED_SUFFIX = '...<truncated>'
+
+_MISSING = object()
+
+
+def _resolve_max_query_len():
+    value = os.getenv(MAX_QUERY_LEN_ENV_VAR)
+    if value is None:
+        return DEFAULT_MAX_QUERY_LEN
+    try:
+        max_len = int(value)
+    except ValueError:
+        max_len = -1
+    if max_len < 0:
+        logger.warning(
+            'Invalid %s value %r, using %s',
+            MAX_QUERY_LEN_ENV_VAR, value, DEFAULT_MAX_QUERY_LEN,
+        )
+        return DEFAULT_MAX_QUERY_LEN
+    return max_len
+
+
+MAX_QUERY_LEN = _resolve_max_query_len()
+
+
+def _resolve_service():
+    return sys.intern(os.getenv(SERVICE_ENV_VAR, SERVICE))
+
+
+_SERVICE_NAME = _resolve_service()
+_SPAN_KW_STATIC = {
+    'name': RES_NAME,
+    'span_type': TYPE,
+    'service': _SERVICE_NAME,
+}
+
+
+def set_service(service):
+    """
+    Overrides default service name resolved from ``SERVICE_ENV_VAR`` at
+    import time.
+    """
+    global _SERVICE_NAME, _SPAN_KW_STATIC
+    _SERVICE_NAME = sys.intern(service)
+    _SPAN_KW_STATIC = dict(_SPAN_KW_STATIC, service=_SERVICE_NAME)
 
 
 class TracedGraphQLSchema(graphql.GraphQLSchema):
+    # GraphQLSchema instances have __dict__, slot only keeps the tracer out of it
+    __slots__ = ('datadog_tracer',)
+
     def __init__(self, *args, **kwargs):
         if 'datadog_tracer' in kwargs:
             self.datadog_tracer = kwargs.pop('datadog_tracer')
@@ -41,9 +94,15 @@ def traced_graphql_wrapped(
     span_kwargs=None,
     span_callback=None,
     ignore_exceptions=(),
+    sync=False,
 ):
     """
     Wrapper for graphql.graphql function.
+
+    With ``sync`` set, ``func`` is known to return result directly (e.g.
+    ``graphql.graphql_sync``) and the coroutine check is skipped.
+    ``ignore_exceptions`` must be an exception class or a tuple of them,
+    see ``normalize_ignore_exceptions``.
     """
     # allow schemas their own tracer with fall-back to the global
     schema = args[0]
@@ -52,15 +111,15 @@ def traced_graphql_wrapped(
     if not tracer.enabled:
         return func(*args, **kwargs)
 
-    query = utils.get_query_string(args, kwargs)
-
+    request = utils.get_request_string(args, kwargs)
+    # not pooled, tracer.trace(**_span_kwargs) copies it anyway and the async
+    # path keeps a reference to it until the coroutine runs
     _span_kwargs = {
-        'name': RES_NAME,
-        'span_type': TYPE,
-        'service': os.getenv(SERVICE_ENV_VAR, SERVICE),
-        'resource': utils.resolve_query_res(query)
+        **_SPAN_KW_STATIC,
+        'resource': utils.resolve_request_res(request),
     }
-    _span_kwargs.update(span_kwargs or {})
+    if span_kwargs:
+        _span_kwargs.update(span_kwargs)
 
     # Convert request_string to source for newer graphql-core compatibility
     if 'request_string' in kwargs:
@@ -70,15 +129,18 @@ def traced_graphql_wrapped(
     result = func(*args, **kwargs)
     
     # Handle async results
-    if asyncio.iscoroutine(result):
+    if not sync and (
+        type(result) is CoroutineType or asyncio.iscoroutine(result)
+    ):
         async def trace_async():
             with tracer.trace(**_span_kwargs) as span:
-                span.set_tag(QUERY, query)
+                actual_result = _MISSING
                 try:
+                    _set_query_tag(span, request)
                     actual_result = await result
                     return actual_result
                 finally:
-                    if 'actual_result' in locals():
+                    if actual_result is not _MISSING:
                         _process_result(actual_result, span, ignore_exceptions, span_callback)
                     else:
                         span.error = 1
@@ -87,54 +149,89 @@ def traced_graphql_wrapped(
     else:
         # Handle sync results
         with tracer.trace(**_span_kwargs) as span:
-            span.set_tag(QUERY, query)
             try:
+                _set_query_tag(span, request)
                 return result
             finally:
                 _process_result(result, span, ignore_exceptions, span_callback)
 
 
+def _is_sampled(span):
+    """
+    Returns whether ``span`` is kept by the sampler.
+
+    Legacy ``RateSampler`` unsets ``span.sampled``, ``DatadogSampler`` keeps it
+    set and rejects the trace with non-positive sampling priority instead.
+    """
+    if not span.sampled:
+        return False
+    priority = span.context.sampling_priority
+    return priority is None or priority > 0
+
+
+def _set_query_tag(span, request):
+    """
+    Sets query tag, skipped for spans dropped by the sampler.
+    """
+    if not _is_sampled(span):
+        return
+    query = utils.get_request_query(request)
+    if len(query) > MAX_QUERY_LEN:
+        query = query[:MAX_QUERY_LEN] + TRUNCATED_SUFFIX
+    span.set_tag(QUERY, query)
+
+
+def _set_error_tags(span, errors):
+    errors_json, stack, msg, type_ = utils.format_errors_all(errors)
+    span.set_tag(ERRORS, errors_json)
+    span.set_tag(ddtrace_errors.ERROR_STACK, stack)
+    span.set_tag(ddtrace_errors.ERROR_MSG, msg)
+    span.set_tag(ddtrace_errors.ERROR_TYPE, type_)
+
+
 def _process_result(result, span, ignore_exceptions, span_callback):
     """Process the result and update the span accordingly."""
-    if result is not None:
+    errors = getattr(result, 'errors', None)
+    if result is None:
+        span.error = 1
+    elif not errors:
+        # fast path for successful results
         span.error = 0
-        if hasattr(result, 'errors') and result.errors:
-            span.set_tag(
-                ERRORS,
-                utils.format_errors(result.errors))
-            span.set_tag(
-                ddtrace_errors.ERROR_STACK,
-                utils.format_errors_traceback(result.errors))
-            span.set_tag(
-                ddtrace_errors.ERROR_MSG,
-                utils.format_errors_msg(result.errors))
-            span.set_tag(
-                ddtrace_errors.ERROR_TYPE,
-                utils.format_errors_type(result.errors))
-
-            span.error = int(utils.is_server_error(
-                result,
-                ignore_exceptions,
-            ))
-
-        span.set_metric(
-            CLIENT_ERROR,
-            int(bool(not span.error and result.errors))
-        )
+        span.set_metric(CLIENT_ERROR, 0)
+        span.set_metric(INVALID, 0)
+        span.set_metric(DATA_EMPTY, int(getattr(result, 'data', None) is None))
+    else:
+        if _is_sampled(span):
+            _set_error_tags(span, errors)
+
+        span.error = int(utils.is_server_error(
+            result,
+            ignore_exceptions,
+        ))
+
+        span.set_metric(CLIENT_ERROR, int(not span.error))
         # For newer graphql-core, determine invalid based on errors and no data
         invalid_value = getattr(result, 'invalid', None)
         if invalid_value is None:
             # Fallback for newer graphql-core: invalid if there are errors and no data
-            invalid_value = int(bool(result.errors and result.data is None))
+            invalid_value = result.data is None
         span.set_metric(INVALID, int(invalid_value))
         span.set_metric(DATA_EMPTY, int(getattr(result, 'data', None) is None))
-    else:
-        span.error = 1
 
     if span_callback is not None:
         span_callback(result=result, span=span)
 
 
+def normalize_ignore_exceptions(ignore_exceptions):
+    """
+    Converts ``ignore_exceptions`` iterable into a tuple usable with
+    ``isinstance``.
+    """
+    if isinstance(ignore_exceptions, (tuple, type)):
+        return ignore_exceptions
+    return tuple(ignore_exceptions)
+
+
 def traced_graphql(
     *args,
     span_kwargs=None,
@@ -146,5 +243,5 @@ def traced_graphql(
         _graphql, args, kwargs,
         span_kwargs=span_kwargs,
         span_callback=span_callback,
-        ignore_exceptions=ignore_exceptions
+        ignore_exceptions=normalize_ignore_exceptions(ignore_exceptions),
     )
\ No newline at end of file
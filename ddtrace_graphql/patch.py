@@ -10,7 +10,10 @@ import graphql
 import wrapt
 from ddtrace.internal.utils.wrappers import unwrap
 
-from ddtrace_graphql.base import traced_graphql_wrapped
+from ddtrace_graphql.base import (
+    normalize_ignore_exceptions,
+    traced_graphql_wrapped,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +22,7 @@ def patch(span_kwargs=None, span_callback=None, ignore_exceptions=()):
     """
     Monkeypatches graphql-core library to trace graphql calls execution.
     """
+    ignore_exceptions = normalize_ignore_exceptions(ignore_exceptions)
 
     def wrapper(func, _, args, kwargs):
         return traced_graphql_wrapped(
@@ -30,13 +34,24 @@ def patch(span_kwargs=None, span_callback=None, ignore_exceptions=()):
             ignore_exceptions=ignore_exceptions,
         )
 
+    def wrapper_sync(func, _, args, kwargs):
+        return traced_graphql_wrapped(
+            func,
+            args,
+            kwargs,
+            span_kwargs=span_kwargs,
+            span_callback=span_callback,
+            ignore_exceptions=ignore_exceptions,
+            sync=True,
+        )
+
     logger.debug("Patching `graphql.graphql` function.")
     wrapt.wrap_function_wrapper(graphql, "graphql", wrapper)
     
     # Also patch graphql_sync if available (newer versions of graphql-core)
     if hasattr(graphql, 'graphql_sync'):
         logger.debug("Patching `graphql.graphql_sync` function.")
-        wrapt.wrap_function_wrapper(graphql, "graphql_sync", wrapper)
+        wrapt.wrap_function_wrapper(graphql, "graphql_sync", wrapper_sync)
 
 
 def unpatch():
@@ -48,7 +63,7 @@ def unpatch():
         unwrap(graphql, "graphql")
         logger.debug("Successfully unpatched `graphql.graphql` function.")
     except Exception as e:
-        logger.warning(f"Failed to unpatch `graphql.graphql` function: {e}")
+        logger.warning("Failed to unpatch `graphql.graphql` function: %s", e)
     
     # Also unpatch graphql_sync if available
     if hasattr(graphql, 'graphql_sync'):
@@ -57,4 +72,4 @@ def unpatch():
             unwrap(graphql, "graphql_sync")
             logger.debug("Successfully unpatched `graphql.graphql_sync` function.")
         except Exception as e:
-            logger.warning(f"Failed to unpatch `graphql.graphql_sync` function: {e}")
\ No newline at end of file
+            logger.warning("Failed to unpatch `graphql.graphql_sync` function: %s", e)
\ No newline at end of file
@@ -1,9 +1,8 @@
 import json
-import re
 import traceback
-from io import StringIO
 
 from graphql.error import GraphQLError
+from graphql.language.source import Source
 try:
     # graphql-core 3.x
     from graphql import DocumentNode
@@ -12,14 +11,26 @@ except ImportError:
     from graphql.language.ast import Document as DocumentNode
 
 
+_MISSING = object()
+# compact separators keep encoding on the C-accelerated path
+_json_dumps = json.JSONEncoder(separators=(',', ':')).encode
+
+
 def format_error(error):
     """Format a GraphQLError for newer graphql-core versions."""
-    if hasattr(error, 'formatted'):
-        return error.formatted
-    elif hasattr(error, 'message'):
-        return {"message": str(error.message)}
-    else:
-        return {"message": str(error)}
+    formatted = getattr(error, 'formatted', _MISSING)
+    if formatted is not _MISSING:
+        return formatted
+    message = getattr(error, 'message', _MISSING)
+    if message is not _MISSING:
+        return {"message": str(message)}
+    return {"message": str(error)}
+
+
+def _format_error_or_str(error):
+    if getattr(error, 'message', _MISSING) is _MISSING:
+        return str(error)
+    return format_error(error)
 
 
 def get_request_string(args, kwargs):
@@ -33,8 +44,21 @@ def get_query_string(args, kwargs):
     """
     Given ``args``, ``kwargs`` of original function, returns query as string.
     """
-    rs = get_request_string(args, kwargs)
-    return rs.loc.source.body if isinstance(rs, DocumentNode) else rs
+    return get_request_query(get_request_string(args, kwargs))
+
+
+def get_request_query(rs):
+    """
+    Returns query as string from request string, ``Source`` or
+    ``DocumentNode``.
+    """
+    if type(rs) is str:
+        return rs
+    if isinstance(rs, DocumentNode):
+        return rs.loc.source.body
+    if isinstance(rs, Source):
+        return rs.body
+    return rs
 
 
 def is_server_error(result, ignore_exceptions):
@@ -43,10 +67,13 @@ def is_server_error(result, ignore_exceptions):
 
     Based on error handling done here https://bit.ly/2JamxWF
     """
-    errors = None if result.errors is None else [
-        error for error in result.errors
-        if not isinstance(original_error(error), ignore_exceptions)
-    ]
+    if not ignore_exceptions or result.errors is None:
+        errors = result.errors
+    else:
+        errors = [
+            error for error in result.errors
+            if not isinstance(original_error(error), ignore_exceptions)
+        ]
     
     # Determine if result is invalid (newer graphql-core compatibility)
     invalid_value = getattr(result, 'invalid', None)
@@ -76,7 +103,7 @@ def original_error(err):
     graphql-core wraps exceptions that occurs on resolvers into special type
     with ``original_error`` attribute, which contains the real exception.
     """
-    return err.original_error if hasattr(err, 'original_error') else err
+    return getattr(err, 'original_error', err)
 
 
 def format_errors(errors):
@@ -87,31 +114,24 @@ def format_errors(errors):
     column number, where the exception at query resolution happened. This
     method tries to extract that information.
     """
-    return json.dumps(
-        [
-            format_error(err) if hasattr(err, 'message') else str(err)
-            for err in errors
-        ],
-        indent=2,
-    )
+    return _json_dumps([_format_error_or_str(err) for err in errors])
 
 
 def format_error_traceback(error, limit=20):
     """
     Returns ``limit`` lines of ``error``s exception traceback.
+
+    Empty string is returned for errors which were never raised.
     """
-    if error is None:
+    if error is None or error.__traceback__ is None:
         return ""
-    
-    buffer_file = StringIO()
-    traceback.print_exception(
+
+    return "".join(traceback.format_exception(
         type(error),
         error,
         error.__traceback__,
-        file=buffer_file,
         limit=limit,
-    )
-    return buffer_file.getvalue()
+    ))
 
 
 def format_errors_traceback(errors):
@@ -119,11 +139,23 @@ def format_errors_traceback(errors):
     Concatenates traceback strings from list of exceptions in ``errors``.
     """
     return "\n\n".join([
-        format_error_traceback(original_error(error))
-        for error in errors if isinstance(error, Exception)
+        stack for stack in (
+            _err_traceback(error)
+            for error in errors if isinstance(error, Exception)
+        )
+        if stack
     ])
 
 
+def _has_traceback(error):
+    return getattr(error, '__traceback__', None) is not None
+
+
+def _err_traceback(error):
+    orig = original_error(error)
+    return format_error_traceback(orig) if _has_traceback(orig) else ""
+
+
 def _err_msg(error):
     return str(original_error(error))
 
@@ -132,12 +164,11 @@ def format_errors_msg(errors):
     """
     Formats error message as json string from list of exceptions ``errors``.
     """
-    return _err_msg(errors[0]) if len(errors) == 1 else json.dumps(
+    return _err_msg(errors[0]) if len(errors) == 1 else _json_dumps(
         [
             _err_msg(error)
             for error in errors if isinstance(error, Exception)
-        ],
-        indent=2
+        ]
     )
 
 
@@ -149,12 +180,44 @@ def format_errors_type(errors):
     """
     Formats error types as json string from list of exceptions ``errors``.
     """
-    return _err_type(errors[0]) if len(errors) == 1 else json.dumps(
+    return _err_type(errors[0]) if len(errors) == 1 else _json_dumps(
         [
             _err_type(error)
             for error in errors if isinstance(error, Exception)
-        ],
-        indent=2
+        ]
+    )
+
+
+def format_errors_all(errors):
+    """
+    Formats list of exceptions ``errors`` in a single pass, used for span
+    error tags.
+
+    Returns tuple of ``format_errors``, ``format_errors_traceback``,
+    ``format_errors_msg`` and ``format_errors_type`` results.
+    """
+    formatted, tracebacks, msgs, types = [], [], [], []
+    for error in errors:
+        formatted.append(_format_error_or_str(error))
+        if not isinstance(error, Exception):
+            continue
+        stack = _err_traceback(error)
+        if stack:
+            tracebacks.append(stack)
+        msgs.append(_err_msg(error))
+        types.append(_err_type(error))
+
+    if len(errors) == 1:
+        msg = _err_msg(errors[0])
+        type_ = _err_type(errors[0])
+    else:
+        msg = _json_dumps(msgs)
+        type_ = _json_dumps(types)
+    return (
+        _json_dumps(formatted),
+        "\n\n".join(tracebacks),
+        msg,
+        type_,
     )
 
 
@@ -162,7 +225,22 @@ def resolve_query_res(query):
     """
     Extracts resource name from ``query`` string.
     """
-    # split by '(' for queries with arguments
-    # split by '{' for queries without arguments
+    # cut at '(' for queries with arguments
+    # cut at '{' for queries without arguments
     # rather full query than empty resource name
-    return re.split('[({]', query, 1)[0].strip() or query
\ No newline at end of file
+    end = len(query)
+    paren = query.find('(')
+    if paren != -1:
+        end = paren
+    brace = query.find('{', 0, end)
+    if brace != -1:
+        end = brace
+    return query[:end].strip() or query
+
+
+def resolve_request_res(request):
+    """
+    Extracts resource name from ``request`` string, ``Source`` or
+    ``DocumentNode``.
+    """
+    return resolve_query_res(get_request_query(request))
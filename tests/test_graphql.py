@@ -1,10 +1,14 @@
-import json
-import os
+import asyncio
+import collections
+import threading
+import time
 
 import graphql
 import ddtrace
+import pytest
 from ddtrace import constants as ddtrace_errors
 from ddtrace.internal.writer import AgentWriter
+from ddtrace.sampler import DatadogSampler, RateSampler
 from graphql import GraphQLField, GraphQLObjectType, GraphQLString
 from graphql.execution import ExecutionResult
 from graphql.language.parser import parse as graphql_parse
@@ -14,8 +18,9 @@ from wrapt import FunctionWrapper
 import ddtrace_graphql
 from ddtrace_graphql import (
     DATA_EMPTY, ERRORS, INVALID, QUERY, SERVICE, CLIENT_ERROR,
-    TracedGraphQLSchema, patch, traced_graphql, unpatch
+    TracedGraphQLSchema, patch, set_service, traced_graphql, unpatch
 )
+from ddtrace_graphql import utils
 from ddtrace_graphql.base import traced_graphql_wrapped
 
 
@@ -26,29 +31,32 @@ class SpanTestWriter:
     """
 
     def __init__(self):
-        self.spans = []
-        self.traces = []
+        self.spans = collections.deque()
+        self.traces = collections.deque()
         self.services = {}
+        # collections are only ever cleared in place, bound methods stay valid
+        self._spans_extend = self.spans.extend
+        self._traces_append = self.traces.append
+        self._evt = threading.Event()
 
     def write(self, spans=None):
         """Write method compatible with ddtrace 1.5.5 AgentWriter interface."""
         if spans:
-            if isinstance(spans, list):
-                self.spans.extend(spans)
-                self.traces.append(spans)
-            else:
-                self.spans.append(spans)
-                self.traces.append([spans])
+            if not isinstance(spans, (list, tuple)):
+                spans = (spans,)
+            self._spans_extend(spans)
+            self._traces_append(spans)
+            self._evt.set()
 
     def pop(self):
         """Get all spans and clear the collection."""
-        spans = self.spans[:]
+        spans = list(self.spans)
         self.spans.clear()
         return spans
 
     def pop_traces(self):
         """Get all traces and clear the collection."""
-        traces = self.traces[:]
+        traces = list(self.traces)
         self.traces.clear()
         return traces
 
@@ -57,6 +65,7 @@ class SpanTestWriter:
         self.spans.clear()
         self.traces.clear()
         self.services.clear()
+        self._evt.clear()
 
     # Stub methods to be compatible with AgentWriter interface
     def start(self):
@@ -95,7 +104,7 @@ def get_dummy_tracer():
     original_on_span = tracer._on_span_finish
     def _on_span_finish(span):
         # Capture span in our test writer
-        test_writer.write([span])
+        test_writer.write((span,))
         # Don't call original to avoid any agent communication
     
     tracer._on_span_finish = _on_span_finish
@@ -106,46 +115,46 @@ def get_dummy_tracer():
 def wait_for_spans(tracer, expected_count=1, timeout=1.0):
     """
     Wait for spans to be processed and written to the test writer.
-    
-    In ddtrace 1.5.5, there might be async processing, so we need to 
-    flush and wait for spans to be available.
+
+    Returned spans are popped from the writer, so the tracer can be shared
+    between consecutive assertions.
+
+    Finished spans are written to the test writer directly by the patched
+    ``_on_span_finish`` of the dummy tracer, so there is nothing to flush.
     """
-    import time
-    start_time = time.time()
-    
-    while time.time() - start_time < timeout:
-        tracer.flush()
-        if hasattr(tracer, 'writer') and len(tracer.writer.spans) >= expected_count:
-            return tracer.writer.spans
-        time.sleep(0.01)  # Small delay to allow processing
-    
+    writer = tracer.writer
+    deadline = time.monotonic() + timeout
+    while len(writer.spans) < expected_count:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not writer._evt.wait(remaining):
+            break
+        writer._evt.clear()
+
     # Return whatever spans we have
-    return tracer.writer.spans if hasattr(tracer, 'writer') else []
+    return writer.pop()
+
+
+def _await(result):
+    """
+    Runs ``result`` on the current event loop if it is a coroutine.
+    """
+    if asyncio.iscoroutine(result):
+        return asyncio.get_event_loop().run_until_complete(result)
+    return result
 
 
 def traced_graphql_sync(schema, *args, **kwargs):
     """
     Synchronous wrapper for traced_graphql that handles async results.
     """
-    import asyncio
-    result = traced_graphql(schema, *args, **kwargs)
-    
-    if asyncio.iscoroutine(result):
-        # Run the coroutine synchronously
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(result)
-        finally:
-            loop.close()
-    else:
-        return result
+    return _await(traced_graphql(schema, *args, **kwargs))
 
 
-def get_traced_schema(tracer=None, query=None, resolver=None):
-    resolver = resolver or (lambda *_: 'world')
-    tracer = tracer or get_dummy_tracer()
-    query = query or GraphQLObjectType(
+_DEFAULT_RESOLVER = lambda *_: 'world'
+
+
+def _hello_query(resolver):
+    return GraphQLObjectType(
         name='RootQueryType',
         fields={
             'hello': GraphQLField(
@@ -154,75 +163,118 @@ def get_traced_schema(tracer=None, query=None, resolver=None):
             )
         }
     )
+
+
+_DEFAULT_QUERY = _hello_query(_DEFAULT_RESOLVER)
+
+
+def get_traced_schema(tracer=None, query=None, resolver=None):
+    tracer = tracer or get_dummy_tracer()
+    resolver = resolver or _DEFAULT_RESOLVER
+    if query is None:
+        query = (
+            _DEFAULT_QUERY if resolver is _DEFAULT_RESOLVER
+            else _hello_query(resolver)
+        )
     return tracer, TracedGraphQLSchema(query=query, datadog_tracer=tracer)
 
 
+# (query, expected resource, span_kwargs)
+_RESOURCE_CASES = (
+    ('{ hello world }', '{ hello world }', None),
+    ('mutation fnCall(args: Args) { }', 'mutation fnCall', None),
+    ('mutation fnCall { }', 'mutation fnCall', None),
+    ('mutation fnCall { }', 'test', {'resource': 'test'}),
+)
+
+
+@pytest.fixture(scope='module', autouse=True)
+def event_loop():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    asyncio.set_event_loop(None)
+    loop.close()
+
+
+@pytest.fixture(scope='session')
+def dummy_tracer():
+    return get_dummy_tracer()
+
+
+@pytest.fixture(scope='module')
+def default_schema(dummy_tracer):
+    return TracedGraphQLSchema(query=_DEFAULT_QUERY, datadog_tracer=dummy_tracer)
+
+
+@pytest.fixture(autouse=True)
+def _reset_writer(dummy_tracer):
+    sampler = dummy_tracer._sampler
+    dummy_tracer.writer.clear()
+    dummy_tracer.enabled = True
+    yield
+    dummy_tracer._sampler = sampler
+
+
 class TestGraphQL:
 
-    def test_unpatch(self):
+    def test_unpatch(self, dummy_tracer, default_schema):
         gql = graphql.graphql
         unpatch()
         assert gql == graphql.graphql
         assert not isinstance(graphql.graphql, FunctionWrapper)
-        patch()
-        assert isinstance(graphql.graphql, FunctionWrapper)
-
-        tracer, schema = get_traced_schema()
-        # Call the patched graphql function directly to test patching
-        result = graphql.graphql_sync(schema, '{ hello }')
-        
-        # Wait for spans to be collected - the patched function should create spans
-        spans = wait_for_spans(tracer, expected_count=1)
-        span = spans[0]
 
-        unpatch()
-        assert gql == graphql.graphql
-
-        cb_args = {}
+        captured = []
         def test_cb(**kwargs):
-            cb_args.update(kwargs)
+            captured.append(kwargs)
         patch(span_callback=test_cb)
         assert isinstance(graphql.graphql, FunctionWrapper)
 
-        # Create fresh tracer for callback test
-        tracer, schema = get_traced_schema()
-        # Call the patched function to test the callback
-        result = graphql.graphql_sync(schema, '{ hello }')
-                
-        # The callback should be called, no need to wait for spans through our test writer
-        # because the callback receives the span directly
-        assert 'span' in cb_args
-        assert 'result' in cb_args
-        assert cb_args['result'] is result
+        # Call the patched graphql function directly to test patching
+        result = graphql.graphql_sync(default_schema, '{ hello }')
+        spans = wait_for_spans(dummy_tracer, expected_count=1)
+        span = spans[0]
+        assert captured[-1]['span'] is span
+        assert captured[-1]['result'] is result
 
         unpatch()
         assert gql == graphql.graphql
 
+    def test_patched_source_request(self, dummy_tracer, default_schema):
+        patch()
+        try:
+            result = graphql.graphql_sync(
+                default_schema, GraphQLSource('{ hello }'))
+        finally:
+            unpatch()
+        assert result.data == {'hello': 'world'}
+        spans = wait_for_spans(dummy_tracer, expected_count=1)
+        span = spans[0]
+        assert span.finished
+        assert span.resource == '{ hello }'
+        assert span.get_tag(QUERY) == '{ hello }'
+        assert dummy_tracer.current_span() is None
 
-
-    def test_invalid(self):
-        tracer, schema = get_traced_schema()
-        result = traced_graphql_sync(schema, '{ hello world }')
-        spans = wait_for_spans(tracer, expected_count=1)
+    def test_invalid(self, dummy_tracer, default_schema):
+        result = traced_graphql_sync(default_schema, '{ hello world }')
+        spans = wait_for_spans(dummy_tracer, expected_count=1)
         span = spans[0]
         assert span.get_metric(INVALID) == 1
         assert span.get_metric(DATA_EMPTY) == 1
         assert span.error == 0
 
-        # Create a fresh tracer for the valid query test
-        tracer, schema = get_traced_schema()
-        result = traced_graphql_sync(schema, '{ hello }')
-        spans = wait_for_spans(tracer, expected_count=1)
+        result = traced_graphql_sync(default_schema, '{ hello }')
+        spans = wait_for_spans(dummy_tracer, expected_count=1)
         span = spans[0]
         assert span.get_metric(INVALID) == 0
         assert span.error == 0
 
-    def test_unhandled_exception(self):
+    def test_unhandled_exception(self, dummy_tracer):
 
         def exc_resolver(*args):
             raise Exception('Testing stuff')
 
-        tracer, schema = get_traced_schema(resolver=exc_resolver)
+        tracer, schema = get_traced_schema(dummy_tracer, resolver=exc_resolver)
         result = traced_graphql_sync(schema, '{ hello }')
         spans = wait_for_spans(tracer, expected_count=1)
         span = spans[0]
@@ -232,8 +284,8 @@ class TestGraphQL:
         assert span.get_metric(DATA_EMPTY) == 0
 
         error_stack = span.get_tag(ddtrace_errors.ERROR_STACK)
+        assert error_stack.startswith('Traceback')
         assert 'Testing stuff' in error_stack
-        assert 'Traceback' in error_stack
 
         error_msg = span.get_tag(ddtrace_errors.ERROR_MSG)
         assert 'Testing stuff' in error_msg
@@ -266,14 +318,14 @@ class TestGraphQL:
         # assert span.error == 1
         # assert span.get_metric(DATA_EMPTY) == 1
 
-    def test_not_server_error(self):
+    def test_not_server_error(self, dummy_tracer):
         class TestException(Exception):
             pass
 
         def exc_resolver(*args):
             raise TestException('Testing stuff')
 
-        tracer, schema = get_traced_schema(resolver=exc_resolver)
+        tracer, schema = get_traced_schema(dummy_tracer, resolver=exc_resolver)
         result = traced_graphql_sync(
             schema,
             '{ hello }',
@@ -286,175 +338,251 @@ class TestGraphQL:
         assert span.get_metric(DATA_EMPTY) == 0
         assert span.get_metric(CLIENT_ERROR) == 1
 
-    def test_request_string_resolve(self):
-        query = '{ hello }'
+    @pytest.mark.parametrize('patched', [False, True])
+    def test_not_server_error_list(self, dummy_tracer, patched):
+        class TestException(Exception):
+            pass
 
-        # string as args[1]
-        tracer, schema = get_traced_schema()
-        traced_graphql_sync(schema, query)
-        spans = wait_for_spans(tracer, expected_count=1)
-        span = spans[0]
-        assert span.get_tag(QUERY) == query
+        def exc_resolver(*args):
+            raise TestException('Testing stuff')
 
-        # string as kwargs.get('request_string')
-        tracer, schema = get_traced_schema()
-        traced_graphql_sync(schema, request_string=query)
+        tracer, schema = get_traced_schema(dummy_tracer, resolver=exc_resolver)
+        if patched:
+            patch(ignore_exceptions=[TestException])
+            try:
+                graphql.graphql_sync(schema, '{ hello }')
+            finally:
+                unpatch()
+        else:
+            traced_graphql_sync(
+                schema, '{ hello }', ignore_exceptions=[TestException])
         spans = wait_for_spans(tracer, expected_count=1)
         span = spans[0]
-        assert span.get_tag(QUERY) == query
+        assert span.error == 0
+        assert span.get_metric(CLIENT_ERROR) == 1
 
-        # ast as args[1] - For newer graphql-core, we need to pass string sources
-        # The test was originally designed for older graphql-core that accepted DocumentNodes
-        # For newer versions, we'll test with string sources
-        tracer, schema = get_traced_schema()
-        traced_graphql_sync(schema, query)  # Use string directly
-        spans = wait_for_spans(tracer, expected_count=1)
+    # ast as args[1] is not covered, graphql-core 3 accepts only string
+    # sources
+    @pytest.mark.parametrize('kwarg', [None, 'request_string', 'source'])
+    def test_request_string_resolve(self, dummy_tracer, default_schema, kwarg):
+        query = '{ hello }'
+        if kwarg is None:
+            traced_graphql_sync(default_schema, query)
+        else:
+            traced_graphql_sync(default_schema, **{kwarg: query})
+        spans = wait_for_spans(dummy_tracer, expected_count=1)
         span = spans[0]
         assert span.get_tag(QUERY) == query
 
-        # source parameter instead of request_string for newer graphql-core
-        tracer, schema = get_traced_schema()
-        traced_graphql_sync(schema, source=query)
-        spans = wait_for_spans(tracer, expected_count=1)
-        span = spans[0]
-        assert span.get_tag(QUERY) == query
+        source = GraphQLSource(query)
+        if kwarg is None:
+            assert utils.get_query_string((default_schema, source), {}) == query
+        else:
+            assert utils.get_query_string(
+                (default_schema,), {kwarg: source}) == query
 
     @staticmethod
-    def test_query_tag():
+    def test_query_tag(dummy_tracer, default_schema):
         query = '{ hello }'
-        tracer, schema = get_traced_schema()
-        traced_graphql_sync(schema, query)
-        spans = wait_for_spans(tracer, expected_count=1)
+        traced_graphql_sync(default_schema, query)
+        spans = wait_for_spans(dummy_tracer, expected_count=1)
         span = spans[0]
         assert span.get_tag(QUERY) == query
 
         # test query also for error span, just in case
         query = '{ hello world }'
-        tracer, schema = get_traced_schema()
-        traced_graphql_sync(schema, query)
-        spans = wait_for_spans(tracer, expected_count=1)
+        traced_graphql_sync(default_schema, query)
+        spans = wait_for_spans(dummy_tracer, expected_count=1)
         span = spans[0]
         assert span.get_tag(QUERY) == query
 
     @staticmethod
-    def test_errors_tag():
+    def test_query_tag_truncated(dummy_tracer, default_schema, monkeypatch):
+        monkeypatch.setattr(ddtrace_graphql.base, 'MAX_QUERY_LEN', 5)
         query = '{ hello }'
-        tracer, schema = get_traced_schema()
-        result = traced_graphql_sync(schema, query)
-        spans = wait_for_spans(tracer, expected_count=1)
+        traced_graphql_sync(default_schema, query)
+        spans = wait_for_spans(dummy_tracer, expected_count=1)
+        span = spans[0]
+        assert span.get_tag(QUERY) == '{ hel...<truncated>'
+        assert span.resource == query
+
+    @staticmethod
+    def test_max_query_len_from_env(monkeypatch, caplog):
+        base = ddtrace_graphql.base
+        monkeypatch.delenv(base.MAX_QUERY_LEN_ENV_VAR, raising=False)
+        assert base._resolve_max_query_len() == base.DEFAULT_MAX_QUERY_LEN
+
+        monkeypatch.setenv(base.MAX_QUERY_LEN_ENV_VAR, '100')
+        assert base._resolve_max_query_len() == 100
+        monkeypatch.setenv(base.MAX_QUERY_LEN_ENV_VAR, '0')
+        assert base._resolve_max_query_len() == 0
+
+        for value in ('8k', '-1'):
+            caplog.clear()
+            monkeypatch.setenv(base.MAX_QUERY_LEN_ENV_VAR, value)
+            assert base._resolve_max_query_len() == base.DEFAULT_MAX_QUERY_LEN
+            assert base.MAX_QUERY_LEN_ENV_VAR in caplog.text
+
+    @staticmethod
+    def test_errors_tag(dummy_tracer, default_schema):
+        query = '{ hello }'
+        result = traced_graphql_sync(default_schema, query)
+        spans = wait_for_spans(dummy_tracer, expected_count=1)
         span = spans[0]
         assert not span.get_tag(ERRORS)
         assert result.errors is span.get_tag(ERRORS) is None
 
-        # Create fresh tracer for error test
-        tracer, schema = get_traced_schema()
         query = '{ hello world }'
-        result = traced_graphql_sync(schema, query)
-        spans = wait_for_spans(tracer, expected_count=1)
+        result = traced_graphql_sync(default_schema, query)
+        spans = wait_for_spans(dummy_tracer, expected_count=1)
         span = spans[0]
         span_errors = span.get_tag(ERRORS)
         assert span_errors
-        _se = json.loads(span_errors)
-        assert len(_se) == len(result.errors) == 1
-        assert 'message' in _se[0]
-        assert 'line' in _se[0]['locations'][0]
-        assert 'column' in _se[0]['locations'][0]
+        assert span_errors.count('"message"') == len(result.errors) == 1
+        assert '"locations":[{"line"' in span_errors
+        assert '"column"' in span_errors
 
     @staticmethod
-    def test_resource():
-        query = '{ hello world }'
-        tracer, schema = get_traced_schema()
-        traced_graphql_sync(schema, query)
-        spans = wait_for_spans(tracer, expected_count=1)
-        span = spans[0]
-        assert span.resource == query
-
-        tracer, schema = get_traced_schema()
-        query = 'mutation fnCall(args: Args) { }'
-        traced_graphql_sync(schema, query)
-        spans = wait_for_spans(tracer, expected_count=1)
-        span = spans[0]
-        assert span.resource == 'mutation fnCall'
-
-        tracer, schema = get_traced_schema()
-        query = 'mutation fnCall { }'
-        traced_graphql_sync(schema, query)
-        spans = wait_for_spans(tracer, expected_count=1)
+    @pytest.mark.parametrize('query, expected, span_kwargs', _RESOURCE_CASES)
+    def test_resource(dummy_tracer, default_schema, query, expected, span_kwargs):
+        traced_graphql_sync(default_schema, query, span_kwargs=span_kwargs)
+        spans = wait_for_spans(dummy_tracer, expected_count=1)
         span = spans[0]
-        assert span.resource == 'mutation fnCall'
+        assert span.resource == expected
 
-        tracer, schema = get_traced_schema()
-        query = 'mutation fnCall { }'
-        traced_graphql_sync(schema, query, span_kwargs={'resource': 'test'})
-        spans = wait_for_spans(tracer, expected_count=1)
+    @staticmethod
+    def test_span_callback(dummy_tracer, default_schema):
+        captured = []
+        def test_cb(**kwargs):
+            captured.append(kwargs)
+        query = '{ hello world }'
+        result = traced_graphql_sync(default_schema, query, span_callback=test_cb)
+        spans = wait_for_spans(dummy_tracer, expected_count=1)
         span = spans[0]
-        assert span.resource == 'test'
+        assert captured[-1]['span'] is span
+        assert captured[-1]['result'] is result
 
     @staticmethod
-    def test_span_callback():
-        cb_args = {}
-        def test_cb(result, span):
-            cb_args.update(dict(result=result, span=span))
-        query = '{ hello world }'
-        tracer, schema = get_traced_schema()
-        result = traced_graphql_sync(schema, query, span_callback=test_cb)
-        spans = wait_for_spans(tracer, expected_count=1)
+    @pytest.mark.parametrize('span_kwargs, expected', [
+        ({'resource': 'test'}, {'resource': 'test'}),
+        (
+            {'service': 'test', 'name': 'test'},
+            {'service': 'test', 'name': 'test', 'resource': '{ hello }'},
+        ),
+    ])
+    def test_span_kwargs_overrides(
+        dummy_tracer, default_schema, span_kwargs, expected
+    ):
+        query = '{ hello }'
+        traced_graphql_sync(default_schema, query, span_kwargs=span_kwargs)
+        spans = wait_for_spans(dummy_tracer, expected_count=1)
         span = spans[0]
-        assert cb_args['span'] is span
-        assert cb_args['result'] is result
+        for attr, value in expected.items():
+            assert getattr(span, attr) == value
 
     @staticmethod
-    def test_span_kwargs_overrides():
+    def test_service_from_env(dummy_tracer, default_schema, monkeypatch):
+        base = ddtrace_graphql.base
+        service = base._SERVICE_NAME
+        env_service = service + '.env'
         query = '{ hello }'
-        tracer, schema = get_traced_schema()
 
-        traced_graphql_sync(schema, query, span_kwargs={'resource': 'test'})
-        spans = wait_for_spans(tracer, expected_count=1)
+        # service name is resolved from the environment once, at import time
+        monkeypatch.setenv(base.SERVICE_ENV_VAR, env_service)
+        traced_graphql_sync(default_schema, query)
+        spans = wait_for_spans(dummy_tracer, expected_count=1)
         span = spans[0]
-        assert span.resource == 'test'
+        assert span.service == service
+        assert base._resolve_service() == env_service
 
-        tracer, schema = get_traced_schema()
-        traced_graphql_sync(
-            schema,
-            query,
-            span_kwargs={
-                'service': 'test',
-                'name': 'test',
-            }
-        )
-        spans = wait_for_spans(tracer, expected_count=1)
-        span = spans[0]
-        assert span.service == 'test'
-        assert span.name == 'test'
-        assert span.resource == '{ hello }'
+        monkeypatch.delenv(base.SERVICE_ENV_VAR)
+        assert base._resolve_service() == SERVICE
 
     @staticmethod
-    def test_service_from_env():
+    def test_set_service(dummy_tracer, default_schema):
         query = '{ hello }'
-        tracer, schema = get_traced_schema()
+        service = ddtrace_graphql.base._SERVICE_NAME
+        set_service('test.test')
+        try:
+            traced_graphql_sync(default_schema, query)
+            spans = wait_for_spans(dummy_tracer, expected_count=1)
+            span = spans[0]
+            assert span.service == 'test.test'
+        finally:
+            set_service(service)
 
-        global traced_graphql
-        traced_graphql_sync(schema, query)
-        spans = wait_for_spans(tracer, expected_count=1)
-        span = spans[0]
-        assert span.service == SERVICE
+    @staticmethod
+    def test_tracer_disabled(dummy_tracer, default_schema, monkeypatch):
+        query = '{ hello world }'
+        dummy_tracer.enabled = False
+        finished = []
+        monkeypatch.setattr(dummy_tracer, '_on_span_finish', finished.append)
+        traced_graphql_sync(default_schema, query)
+        assert not finished
 
-        os.environ['DDTRACE_GRAPHQL_SERVICE'] = 'test.test'
+    @staticmethod
+    @pytest.mark.parametrize('get_sampler', [
+        lambda: RateSampler(0.0),
+        lambda: DatadogSampler(default_sample_rate=0.0),
+    ], ids=['rate', 'datadog'])
+    def test_unsampled(dummy_tracer, default_schema, get_sampler):
+        query = '{ hello world }'
+        dummy_tracer._sampler = get_sampler()
+        traced_graphql_sync(default_schema, query)
+        spans = wait_for_spans(dummy_tracer, expected_count=1)
+        span = spans[0]
+        assert span.resource == query
+        assert span.get_tag(QUERY) is None
+        assert span.get_tag(ERRORS) is None
+        assert span.get_metric(INVALID) == 1
 
-        tracer, schema = get_traced_schema()
-        traced_graphql_sync(schema, query)
-        spans = wait_for_spans(tracer, expected_count=1)
+        captured = []
+        def test_cb(**kwargs):
+            captured.append(kwargs)
+        dummy_tracer._sampler = get_sampler()
+        traced_graphql_sync(default_schema, query, span_callback=test_cb)
+        spans = wait_for_spans(dummy_tracer, expected_count=1)
         span = spans[0]
-        assert span.service == 'test.test'
-        
-        # Clean up environment variable
-        del os.environ['DDTRACE_GRAPHQL_SERVICE']
+        assert captured[-1]['span'] is span
+        assert span.resource == query
+        assert span.get_tag(QUERY) is None
 
     @staticmethod
-    def test_tracer_disabled():
-        query = '{ hello world }'
-        tracer, schema = get_traced_schema()
-        tracer.enabled = False
-        traced_graphql_sync(schema, query)
-        spans = wait_for_spans(tracer, expected_count=0, timeout=0.1)
-        assert not spans
\ No newline at end of file
+    def test_resolve_request_res():
+        source = GraphQLSource('query fnCall($id: ID) { hello }', 'Test Request')
+        assert utils.resolve_request_res(source) == 'query fnCall'
+        assert utils.resolve_request_res(graphql_parse(source)) == 'query fnCall'
+        assert utils.resolve_request_res('{ hello }') == '{ hello }'
+
+    @staticmethod
+    def test_format_errors_all():
+        errors = []
+        for exc in (ValueError('first'), KeyError('second')):
+            try:
+                raise exc
+            except Exception as error:
+                errors.append(error)
+        errors.append(ValueError('never raised'))
+
+        errors_json, stack, msg, type_ = utils.format_errors_all(errors)
+        assert errors_json == '["first","\'second\'","never raised"]'
+        assert stack.startswith('Traceback')
+        assert stack.count('Traceback') == 2
+        assert 'ValueError: first' in stack
+        assert "KeyError: 'second'" in stack
+        assert 'never raised' not in stack
+        assert msg == errors_json
+        assert type_ == '["ValueError","KeyError","ValueError"]'
+
+        assert utils.format_errors_all(errors[-1:]) == (
+            '["never raised"]', '', 'never raised', 'ValueError')
+
+        assert utils.format_errors(errors) == errors_json
+        assert utils.format_errors_traceback(errors) == stack
+        assert utils.format_errors_msg(errors) == msg
+        assert utils.format_errors_type(errors) == type_
+
+    @staticmethod
+    def test_format_errors_traceback_not_raised():
+        assert utils.format_errors_traceback([ValueError('never raised')]) == ''
+        assert utils.format_error_traceback(ValueError('never raised')) == ''